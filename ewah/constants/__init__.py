@@ -38,6 +38,19 @@ class EWAHConstants:
     DS_MIXED = "mixed"
     DS_IDEMPOTENT = "idempotent"
 
+    # Airflow metadata tables to clean when resetting DAGs - children first
+    # (like "airflow dags delete", keep the audit trail in the log table)
+    AIRFLOW_METADATA_RESET_TABLES = [
+        "xcom",
+        "task_reschedule",
+        "task_fail",
+        "rendered_task_instance_fields",
+        "task_instance",
+        "sla_miss",
+        "job",
+        "dag_run",
+    ]
+
     # Available Extract Strategies
     ES_FULL_REFRESH = "full-refresh"  # load all available data
     ES_INCREMENTAL = "incremental"  # just load data pertaining to a certain time
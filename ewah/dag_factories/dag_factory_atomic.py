@@ -127,11 +127,12 @@ def dag_factory_atomic(
     )
 
     base_config = deepcopy(additional_task_args)
-    base_config.update(operator_config.get("general_config", {}))
+    base_config.update(operator_config.get("general_config") or {})
     with dag:
-        for table in operator_config["tables"].keys():
+        for table, table_conf in operator_config["tables"].items():
+            table_conf = table_conf or {}
             table_config = deepcopy(base_config)
-            table_config.update(operator_config["tables"][table] or {})
+            table_config.update(table_conf)
             table_config.update(
                 {
                     "task_id": "extract_load_" + re.sub(r"[^a-zA-Z0-9_]", "", table),
@@ -141,9 +142,7 @@ def dag_factory_atomic(
                         "extract_strategy", None
                     )
                     or EC.ES_FULL_REFRESH,  # value can be given as None in table conf
-                    "target_table_name": operator_config["tables"][table].get(
-                        "target_table_name", table
-                    ),
+                    "target_table_name": table_conf.get("target_table_name", table),
                     "target_schema_name": target_schema_name,
                     "target_schema_suffix": target_schema_suffix,
                     "target_database_name": target_database_name,
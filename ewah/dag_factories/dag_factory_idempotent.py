@@ -5,7 +5,11 @@ from airflow.operators.bash import BashOperator
 from ewah.constants import EWAHConstants as EC
 from ewah.uploaders.bigquery import BigqueryOperator
 from ewah.uploaders.snowflake import SnowflakeOperator
-from ewah.utils.airflow_utils import PGO, datetime_utcnow_with_tz
+from ewah.utils.airflow_utils import (
+    PGO,
+    EWAHResetMetadataOperator,
+    datetime_utcnow_with_tz,
+)
 from ewah.hooks.base import EWAHBaseHook as BaseHook
 from ewah.operators.base import EWAHBaseOperator
 from ewah.uploaders import get_uploader
@@ -38,6 +42,10 @@ class ExtendedETS(ExternalTaskSensor):
         self.backfill_execution_date_fn = backfill_execution_date_fn
         self.backfill_external_task_id = backfill_external_task_id
 
+        # don't block a worker and pool slot while waiting by default
+        kwargs.setdefault("mode", "reschedule")
+        kwargs.setdefault("poke_interval", 5 * 60)
+
         super().__init__(*args, **kwargs)
 
     def execute(self, context: dict) -> None:
@@ -87,6 +95,10 @@ def dag_factory_idempotent(
     logging_func: Optional[Callable] = None,
     dagrun_timeout_factor: Optional[float] = None,
     task_timeout_factor: Optional[float] = 0.8,
+    airflow_conn_id: Optional[str] = None,
+    reset_metadata_via_sql: bool = False,
+    sensor_mode: str = "reschedule",
+    sensor_poke_interval: Union[int, float, timedelta] = 5 * 60,
     **kwargs,
 ) -> Tuple[DAG, DAG, DAG]:
     """Returns a tuple of three DAGs associated with incremental data loading.
@@ -141,6 +153,17 @@ def dag_factory_idempotent(
     :param logging_func: Pass a callable for logging output. Defaults to print.
     :param dag_timeout_factor: Set a timeout factor for dag runs so they fail if
         they exceed a percentage of their schedule_interval (default: 0.8).
+    :param airflow_conn_id: Optional connection ID of the Airflow metadata
+        database (PostgreSQL). Required if reset_metadata_via_sql is True. The
+        connection may point to a PgBouncer with pool_mode = transaction.
+    :param reset_metadata_via_sql: If True, the Reset DAG deletes the DAGs'
+        metadata directly in the Airflow metadata database via airflow_conn_id
+        instead of calling "airflow dags delete" (default: False).
+    :param sensor_mode: Mode of the sensors that wait for the previous DAG run
+        ("poke" or "reschedule"). Rescheduling frees the worker slot in between
+        pokes (default: reschedule).
+    :param sensor_poke_interval: Time between two pokes of the sensors, in
+        seconds or as timedelta (default: 5 minutes).
     """
 
     def raise_exception(msg: str) -> None:
@@ -155,9 +178,10 @@ def dag_factory_idempotent(
     additional_dag_args = additional_dag_args or {}
     additional_task_args = additional_task_args or {}
 
-    if not isinstance(schedule_interval_future, timedelta):
-        raise_exception("Schedule intervals must be datetime.timedelta!")
-    if not isinstance(schedule_interval_backfill, timedelta):
+    if not (
+        isinstance(schedule_interval_future, timedelta)
+        and isinstance(schedule_interval_backfill, timedelta)
+    ):
         raise_exception("Schedule intervals must be datetime.timedelta!")
     if schedule_interval_backfill < timedelta(days=1):
         raise_exception("Backfill schedule interval cannot be below 1 day!")
@@ -166,6 +190,11 @@ def dag_factory_idempotent(
             "Backfill schedule interval must be larger than"
             + " regular schedule interval!"
         )
+    if isinstance(sensor_poke_interval, timedelta):
+        # Airflow sensors only accept a number of seconds
+        sensor_poke_interval = sensor_poke_interval.total_seconds()
+    if reset_metadata_via_sql and not airflow_conn_id:
+        raise_exception("reset_metadata_via_sql requires an airflow_conn_id!")
     if not operator_config.get("tables"):
         raise_exception('Requires a "tables" dictionary in operator_config!')
     if not read_right_users is None:
@@ -185,21 +214,18 @@ def dag_factory_idempotent(
     #   normal DAG can then resume as per normal. Note: in that case,
     #   keep both DAGs active!
     current_time += schedule_interval_future / 2
-    # How much time has passed in total between start_date and now?
-    switch_absolute_date = current_time - start_date
-    # How often could the backfill DAG run in that time frame?
-    switch_absolute_date /= schedule_interval_backfill
-    switch_absolute_date = int(switch_absolute_date)
+    # How often could the backfill DAG run between start_date and now?
+    #   Floor division of timedeltas is exact integer arithmetic, unlike
+    #   float division, and the backfill can't run less than zero times
+    backfill_tasks_count = max(
+        (current_time - start_date) // schedule_interval_backfill, 0
+    )
     # What is the exact datetime after the last of those runs?
-    switch_absolute_date *= schedule_interval_backfill
-    switch_absolute_date += start_date
+    switch_absolute_date = (
+        start_date + backfill_tasks_count * schedule_interval_backfill
+    )
     # --> switch_absolute_date is always in the (recent) past
 
-    # Make sure that the backfill and normal DAG start_date and
-    #   schedule_interval calculations were successful and correct
-    backfill_timedelta = switch_absolute_date - start_date
-    backfill_tasks_count = backfill_timedelta / schedule_interval_backfill
-
     if end_date:
         backfill_end_date = min(switch_absolute_date, end_date)
     else:
@@ -266,21 +292,41 @@ def dag_factory_idempotent(
         ),
     )
 
+    if dwh_engine == EC.DWH_ENGINE_SNOWFLAKE and not target_database_name:
+        # Look up the connection once instead of in every schema task factory call
+        target_database_name = BaseHook.get_connection(dwh_conn_id).database
+
     # Create reset DAG
-    reset_bash_command = " && ".join(  # First pause DAGs, then delete their metadata
-        [
-            "airflow dags pause {dag_name}_Idempotent",
-            "airflow dags pause {dag_name}_Idempotent_Backfill",
+    reset_bash_commands = [  # First pause DAGs
+        "airflow dags pause {dag_name}_Idempotent",
+        "airflow dags pause {dag_name}_Idempotent_Backfill",
+    ]
+    if reset_metadata_via_sql:
+        # Metadata is deleted by a separate task below
+        reset_task_id = "pause_dags"
+    else:
+        # Then delete their metadata
+        reset_task_id = "reset_by_deleting_all_task_instances"
+        reset_bash_commands += [
             "airflow dags delete {dag_name}_Idempotent -y",
             "airflow dags delete {dag_name}_Idempotent_Backfill -y",
         ]
-    ).format(dag_name=dag_name)
     reset_task = BashOperator(
-        bash_command=reset_bash_command,
-        task_id="reset_by_deleting_all_task_instances",
+        bash_command=" && ".join(reset_bash_commands).format(dag_name=dag_name),
+        task_id=reset_task_id,
         dag=dags[2],
         **additional_task_args,
     )
+    if reset_metadata_via_sql:
+        reset_metadata_task = EWAHResetMetadataOperator(
+            dag_ids=[dags[0]._dag_id, dags[1]._dag_id],
+            postgres_conn_id=airflow_conn_id,
+            task_id="reset_by_deleting_dag_metadata",
+            dag=dags[2],
+            **additional_task_args,
+        )
+        reset_task >> reset_metadata_task
+        reset_task = reset_metadata_task
     drop_sql = """
         DROP SCHEMA IF EXISTS "{target_schema_name}" CASCADE;
         DROP SCHEMA IF EXISTS "{target_schema_name}{suffix}" CASCADE;
@@ -324,55 +370,56 @@ def dag_factory_idempotent(
 
     reset_task >> drop_task
 
-    # Incremental DAG schema tasks
-    kickoff, final = get_uploader(dwh_engine).get_schema_tasks(
-        dag=dags[0],
+    # Schema tasks are the same for both DAGs except for their DAG and timeout
+    uploader = get_uploader(dwh_engine)
+    schema_task_kwargs = dict(
+        additional_task_args,
         dwh_engine=dwh_engine,
         target_schema_name=target_schema_name,
         target_schema_suffix=target_schema_suffix,
         target_database_name=target_database_name,
         dwh_conn_id=dwh_conn_id,
         read_right_users=read_right_users,
+    )
+
+    # Incremental DAG schema tasks
+    kickoff, final = uploader.get_schema_tasks(
+        dag=dags[0],
         execution_timeout=execution_timeout,
-        **additional_task_args,
+        **schema_task_kwargs,
     )
 
     # Backfill DAG schema tasks
-    kickoff_backfill, final_backfill = get_uploader(dwh_engine).get_schema_tasks(
+    kickoff_backfill, final_backfill = uploader.get_schema_tasks(
         dag=dags[1],
-        dwh_engine=dwh_engine,
-        target_schema_name=target_schema_name,
-        target_schema_suffix=target_schema_suffix,
-        target_database_name=target_database_name,
-        dwh_conn_id=dwh_conn_id,
-        read_right_users=read_right_users,
         execution_timeout=execution_timeout_backfill,
-        **additional_task_args,
+        **schema_task_kwargs,
     )
 
     # add table creation tasks
     arg_dict = deepcopy(additional_task_args)
-    arg_dict.update(operator_config.get("general_config", {}))
+    arg_dict.update(operator_config.get("general_config") or {})
     # Default reload_data_from to start_date
     arg_dict["reload_data_from"] = arg_dict.get("reload_data_from", start_date)
-    for table in operator_config["tables"].keys():
+    # Same for all tables - overwrite / ignore changes to these kwargs
+    dwh_kwargs = {
+        "dwh_engine": dwh_engine,
+        "dwh_conn_id": dwh_conn_id,
+        "target_schema_name": target_schema_name,
+        "target_schema_suffix": target_schema_suffix,
+        "target_database_name": target_database_name,
+    }
+    for table, table_config in operator_config["tables"].items():
+        table_config = table_config or {}
         kwargs = deepcopy(arg_dict)
-        kwargs.update(operator_config["tables"][table] or {})
+        kwargs.update(table_config)
 
         # Overwrite / ignore changes to these kwargs:
         kwargs.update(
-            {
-                "extract_strategy": kwargs.get("extract_strategy", EC.ES_INCREMENTAL),
-                "task_id": "extract_load_" + re.sub(r"[^a-zA-Z0-9_]", "", table),
-                "dwh_engine": dwh_engine,
-                "dwh_conn_id": dwh_conn_id,
-                "target_table_name": operator_config["tables"][table].get(
-                    "target_table_name", table
-                ),
-                "target_schema_name": target_schema_name,
-                "target_schema_suffix": target_schema_suffix,
-                "target_database_name": target_database_name,
-            }
+            dwh_kwargs,
+            extract_strategy=kwargs.get("extract_strategy", EC.ES_INCREMENTAL),
+            task_id="extract_load_" + re.sub(r"[^a-zA-Z0-9_]", "", table),
+            target_table_name=table_config.get("target_table_name", table),
         )
         assert kwargs["extract_strategy"] in (
             EC.ES_FULL_REFRESH,
@@ -412,8 +459,8 @@ def dag_factory_idempotent(
             backfill_external_task_id=final_backfill.task_id,
             backfill_execution_delta=schedule_interval_backfill,
             dag=dags[0],
-            poke_interval=5 * 60,
-            mode="reschedule",  # don't block a worker and pool slot
+            poke_interval=sensor_poke_interval,
+            mode=sensor_mode,
             **additional_task_args,
         ),
         ExtendedETS(
@@ -423,8 +470,8 @@ def dag_factory_idempotent(
             external_task_id=final_backfill.task_id,
             execution_delta=schedule_interval_backfill,
             dag=dags[1],
-            poke_interval=5 * 60,
-            mode="reschedule",  # don't block a worker and pool slot
+            poke_interval=sensor_poke_interval,
+            mode=sensor_mode,
             **additional_task_args,
         ),
     )
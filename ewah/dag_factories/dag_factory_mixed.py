@@ -19,6 +19,7 @@ from ewah.dag_factories.dag_factory_idempotent import ExtendedETS
 from ewah.utils.airflow_utils import (
     PGO,
     datetime_utcnow_with_tz,
+    EWAHResetMetadataOperator,
     EWAHSqlSensor,
 )
 from ewah.operators.base import EWAHBaseOperator
@@ -55,6 +56,8 @@ def dag_factory_mixed(
     logging_func: Optional[Callable] = None,
     dagrun_timeout_factor: Optional[float] = None,
     task_timeout_factor: Optional[float] = 0.8,
+    sensor_mode: str = "reschedule",
+    sensor_poke_interval: Union[int, float, timedelta] = 5 * 60,
     **kwargs,
 ) -> Tuple[DAG, DAG]:
     def raise_exception(msg: str) -> None:
@@ -78,6 +81,9 @@ def dag_factory_mixed(
         raise_exception("schedule_interval_full_refresh must be timedelta!")
     if not isinstance(schedule_interval_incremental, timedelta):
         raise_exception("schedule_interval_incremental must be timedelta!")
+    if isinstance(sensor_poke_interval, timedelta):
+        # Airflow sensors only accept a number of seconds
+        sensor_poke_interval = sensor_poke_interval.total_seconds()
     if schedule_interval_incremental >= schedule_interval_full_refresh:
         _msg = "schedule_interval_incremental must be shorter than "
         _msg += "schedule_interval_full_refresh!"
@@ -125,9 +131,8 @@ def dag_factory_mixed(
         # start_date_fr = start_date + _td * schedule_interval_full_refresh
         # start_date_inc = start_date_fr + schedule_interval_full_refresh
 
+    # No need to copy, the DAGs make their own (deep) copy of default_args
     default_args = default_args or {}
-    default_args_fr = deepcopy(default_args)
-    default_args_inc = deepcopy(default_args)
 
     if dagrun_timeout_factor:
         _msg = "dagrun_timeout_factor must be a number between 0 and 1!"
@@ -161,7 +166,7 @@ def dag_factory_mixed(
             schedule_interval=schedule_interval_full_refresh,
             catchup=True,
             max_active_runs=1,
-            default_args=default_args_fr,
+            default_args=default_args,
             dagrun_timeout=dagrun_timeout_fr,
             **additional_dag_args,
         ),
@@ -172,7 +177,7 @@ def dag_factory_mixed(
             schedule_interval=schedule_interval_incremental,
             catchup=True,
             max_active_runs=1,
-            default_args=default_args_inc,
+            default_args=default_args,
             dagrun_timeout=dagrun_timeout_inc,
             **additional_dag_args,
         ),
@@ -188,21 +193,33 @@ def dag_factory_mixed(
         ),
     )
 
+    if dwh_engine == EC.DWH_ENGINE_SNOWFLAKE and not target_database_name:
+        # Look up the connection once instead of in every schema task factory call
+        target_database_name = EWAHBaseHook.get_connection(dwh_conn_id).database
+
     # Create reset DAG
-    reset_bash_command = " && ".join(  # First pause DAGs, then delete their metadata
+    reset_bash_command = " && ".join(  # First pause DAGs, metadata is deleted below
         [
             "airflow dags pause {dag_name}_Mixed_Atomic",
             "airflow dags pause {dag_name}_Mixed_Idempotent",
-            "airflow dags delete {dag_name}_Mixed_Atomic -y",
-            "airflow dags delete {dag_name}_Mixed_Idempotent -y",
         ]
     ).format(dag_name=dag_name)
     reset_task = BashOperator(
         bash_command=reset_bash_command,
-        task_id="reset_by_deleting_all_task_instances",
+        task_id="pause_dags",
         dag=dags[2],
         **additional_task_args,
     )
+    # "airflow dags delete" matches dag_id with LIKE (for SubDAGs) - use equality
+    # so Postgres can use the dag_id indices
+    reset_metadata_task = EWAHResetMetadataOperator(
+        dag_ids=[dag_name_fr, dag_name_inc],
+        postgres_conn_id=airflow_conn_id,
+        task_id="reset_by_deleting_dag_metadata",
+        dag=dags[2],
+        **additional_task_args,
+    )
+    reset_task >> reset_metadata_task
     drop_sql = """
         DROP SCHEMA IF EXISTS "{target_schema_name}" CASCADE;
         DROP SCHEMA IF EXISTS "{target_schema_name}{suffix}" CASCADE;
@@ -230,28 +247,28 @@ def dag_factory_mixed(
     else:
         raise_exception(f'DWH "{dwh_engine}" not implemented for this task!')
 
-    kickoff_fr, final_fr = get_uploader(dwh_engine).get_schema_tasks(
-        dag=dags[0],
+    # Schema tasks are the same for both DAGs except for their DAG and timeout
+    uploader = get_uploader(dwh_engine)
+    schema_task_kwargs = dict(
+        additional_task_args,
         dwh_engine=dwh_engine,
         dwh_conn_id=dwh_conn_id,
         target_schema_name=target_schema_name,
         target_schema_suffix=target_schema_suffix,
         target_database_name=target_database_name,
         read_right_users=read_right_users,
+    )
+
+    kickoff_fr, final_fr = uploader.get_schema_tasks(
+        dag=dags[0],
         execution_timeout=execution_timeout_fr,
-        **additional_task_args,
+        **schema_task_kwargs,
     )
 
-    kickoff_inc, final_inc = get_uploader(dwh_engine).get_schema_tasks(
+    kickoff_inc, final_inc = uploader.get_schema_tasks(
         dag=dags[1],
-        dwh_engine=dwh_engine,
-        dwh_conn_id=dwh_conn_id,
-        target_schema_name=target_schema_name,
-        target_schema_suffix=target_schema_suffix,
-        target_database_name=target_database_name,
-        read_right_users=read_right_users,
         execution_timeout=execution_timeout_inc,
-        **additional_task_args,
+        **schema_task_kwargs,
     )
 
     sql_fr = """
@@ -278,8 +295,8 @@ def dag_factory_mixed(
         conn_id=airflow_conn_id,
         sql=sql_fr,
         dag=dags[0],
-        poke_interval=5 * 60,
-        mode="reschedule",  # don't block a worker and pool slot
+        poke_interval=sensor_poke_interval,
+        mode=sensor_mode,
         **additional_task_args,
     )
 
@@ -295,32 +312,33 @@ def dag_factory_mixed(
         backfill_external_task_id=final_fr.task_id,
         backfill_execution_delta=schedule_interval_full_refresh,
         dag=dags[1],
-        poke_interval=5 * 60,
-        mode="reschedule",  # don't block a worker and pool slot
+        poke_interval=sensor_poke_interval,
+        mode=sensor_mode,
         **additional_task_args,
     )
 
     fr_snsr >> kickoff_fr
     inc_ets >> kickoff_inc
 
-    for table in operator_config["tables"].keys():
-        arg_dict_inc = deepcopy(additional_task_args)
-        arg_dict_inc.update(operator_config.get("general_config", {}))
-        op_conf = operator_config["tables"][table] or {}
+    arg_dict = deepcopy(additional_task_args)
+    arg_dict.update(operator_config.get("general_config") or {})
+    # Same for all tables - overwrite / ignore changes to these kwargs
+    dwh_kwargs = {
+        "dwh_engine": dwh_engine,
+        "dwh_conn_id": dwh_conn_id,
+        "target_schema_name": target_schema_name,
+        "target_schema_suffix": target_schema_suffix,
+        "target_database_name": target_database_name,
+    }
+    for table, op_conf in operator_config["tables"].items():
+        arg_dict_inc = deepcopy(arg_dict)
+        op_conf = op_conf or {}
         arg_dict_inc.update(op_conf)
         arg_dict_inc.update(
-            {
-                "extract_strategy": arg_dict_inc.get(
-                    "extract_strategy", EC.ES_INCREMENTAL
-                ),
-                "task_id": "extract_load_" + re.sub(r"[^a-zA-Z0-9_]", "", table),
-                "dwh_engine": dwh_engine,
-                "dwh_conn_id": dwh_conn_id,
-                "target_table_name": op_conf.get("target_table_name", table),
-                "target_schema_name": target_schema_name,
-                "target_schema_suffix": target_schema_suffix,
-                "target_database_name": target_database_name,
-            }
+            dwh_kwargs,
+            extract_strategy=arg_dict_inc.get("extract_strategy", EC.ES_INCREMENTAL),
+            task_id="extract_load_" + re.sub(r"[^a-zA-Z0-9_]", "", table),
+            target_table_name=op_conf.get("target_table_name", table),
         )
         arg_dict_inc["load_strategy"] = arg_dict_inc.get(
             "load_strategy", EC.DEFAULT_LS_PER_ES[arg_dict_inc["extract_strategy"]]
@@ -1,7 +1,17 @@
 from ewah.hooks.base import EWAHBaseHook
+from ewah.utils.python_utils import bounded_imap
+
+from itertools import chain, count
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import requests
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 
 class EWAHAirflowHook(EWAHBaseHook):
     """Get Airflow Metadata from an Airflow installation via the stable API."""
@@ -58,7 +68,12 @@ class EWAHAirflowHook(EWAHBaseHook):
         }
 
     def get_data_in_batches(
-        self, endpoint, page_size=100, batch_size=10000, data_from=None
+        self,
+        endpoint,
+        page_size=100,
+        batch_size=10000,
+        data_from=None,
+        thread_pool_size=4,
     ):
         endpoint = self._ENDPOINTS.get(endpoint, endpoint)
         params = {}
@@ -67,7 +82,20 @@ class EWAHAirflowHook(EWAHBaseHook):
             # get DagRuns that ended since data_from
             params["end_date_gte"] = data_from.isoformat()
             params["order_by"] = "end_date"
-        auth = requests.auth.HTTPBasicAuth(self.conn.login, self.conn.password)
+        # Re-use one TCP (+TLS) connection for all pages of the request
+        session = requests.Session()
+        session.auth = requests.auth.HTTPBasicAuth(self.conn.login, self.conn.password)
+        # JSON responses are highly repetitive and compress well
+        session.headers.update(
+            {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=thread_pool_size,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
         if self.conn.ssh_conn_id:
             ssh_hook = EWAHBaseHook.get_hook_from_conn_id(conn_id=self.conn.ssh_conn_id)
             ssh_host = self.conn.host or "localhost"
@@ -92,39 +120,58 @@ class EWAHAirflowHook(EWAHBaseHook):
                 host = self.conn.protocol + "://" + host
         url = self._BASE_URL.format(host, endpoint)
         params["limit"] = page_size
-        params["offset"] = 0
-        data = []
-        i = 0
-        while True:
-            i += 1
-            self.log.info("Making request {0} to {1}...".format(i, url))
-            request = requests.get(url, params=params, auth=auth)
-            assert request.status_code == 200, request.text
-            response = request.json()
-            keys = list(response.keys())
-            if "total_entries" in keys:
+        log_info = self.log.info
+        session_get = session.get
+
+        def get_page(offset):
+            log_info("Making request to {0} at offset {1}...".format(url, offset))
+            request = session_get(url, params=dict(params, offset=offset))
+            if not request.status_code == 200:
+                # Body can be large - only read it on failure and truncate it
+                raise Exception(f"Error {request.status_code}: {request.text[:1024]}")
+            return json_loads(request.content)
+
+        prefetched_pages = None
+        try:
+            response = get_page(0)
+            if "total_entries" in response:
                 # Most endpoint use pagination + give "total_entries" for requests
+                # total_entries is not reliable, but good enough to fetch the pages
+                # it announces concurrently - keep going page by page after those
+                offsets = range(page_size, response["total_entries"], page_size)
                 # The key to get the data from the response may differ from endpoint
-                if keys[0] == "total_entries":
-                    data_key = keys[1]
-                else:
-                    data_key = keys[0]
-                if not response[data_key]:
-                    # You know that you fetched all items if an empty list is returned
-                    # (Note: total_entries is not reliable)
-                    yield data
-                    data = []
-                    break
-                data += response[data_key]
-                if len(data) >= batch_size:
-                    yield data
-                    data = []
+                data_key = next(key for key in response if key != "total_entries")
+                prefetched_pages = bounded_imap(get_page, offsets, thread_pool_size)
+                responses = chain(
+                    [response],
+                    prefetched_pages,
+                    map(get_page, count(page_size * (len(offsets) + 1), page_size)),
+                )
+                data = []
+                for response in responses:
+                    if not response[data_key]:
+                        # You know that you fetched all items if an empty list
+                        # is returned (Note: total_entries is not reliable)
+                        break
+                    if page_size >= batch_size:
+                        # No need to buffer, every page holds one or more batches
+                        records = response[data_key]
+                        for i in range(0, len(records), batch_size):
+                            yield records[i : i + batch_size]
+                        continue
+                    data.extend(response[data_key])
+                    if len(data) >= batch_size:
+                        yield data
+                        data = []
+                yield data
             else:
                 # Rare endpoint that does not paginate (usually singletons)
                 yield [response]
-                break
-            params["offset"] = params["offset"] + params["limit"]
-
-        if self.conn.ssh_conn_id:
-            ssh_hook.stop_tunnel()
-            del ssh_hook
+        finally:
+            # Clean up even if a request fails or the consumer stops early
+            if prefetched_pages is not None:
+                prefetched_pages.close()  # stops fetching pages in the background
+            session.close()
+            if self.conn.ssh_conn_id:
+                ssh_hook.stop_tunnel()
+                del ssh_hook
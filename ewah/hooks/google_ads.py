@@ -81,7 +81,7 @@ class EWAHGoogleAdsHook(EWAHBaseHook):
             fields = []
             for key, value in dict_to_format.items():
                 for item in value:
-                    if type(item) == dict:
+                    if isinstance(item, dict):
                         fields += format_columns(item, prefix + key)
                     else:
                         fields += [prefix + key + "." + item]
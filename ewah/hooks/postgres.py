@@ -89,3 +89,28 @@ class EWAHPostgresHook(EWAHSQLBaseHook):
         cur = self.dictcursor if return_dict else self.cursor
         self.execute(sql, params=params, cursor=cur, commit=False)
         return cur.fetchall()
+
+    def get_data_in_batches(
+        self,
+        sql: str,
+        params: Optional[dict] = None,
+        return_dict: bool = True,
+        batch_size: int = 10000,
+    ):
+        # Use a named (server-side) cursor - otherwise psycopg2 loads the entire
+        # result set into memory before the first batch is returned
+        cur = self.dbconn.cursor(
+            name="ewah_get_data_in_batches",
+            cursor_factory=RealDictCursor if return_dict else None,
+        )
+        try:
+            self.execute(sql, params=params, cursor=cur, commit=False)
+            while True:
+                self.log.info("Fetching next batch...")
+                data = cur.fetchmany(batch_size)
+                if data:
+                    yield data
+                else:
+                    break
+        finally:
+            cur.close()
@@ -31,7 +31,8 @@ class EWAHGoogleAdsOperator(EWAHBaseOperator):
     ):
 
         if metrics:
-            fields["metrics"] = metrics
+            # Don't mutate the caller's dict, it may be shared between tasks
+            fields = dict(fields, metrics=metrics)
 
         kwargs["primary_key"] = list(
             set(
@@ -74,7 +75,7 @@ class EWAHGoogleAdsOperator(EWAHBaseOperator):
         fields = []
         for key, value in dict_format.items():
             for item in value:
-                if type(item) == dict:
+                if isinstance(item, dict):
                     fields += self.get_select_statement(item, prefix + key)
                 else:
                     fields += [prefix + key + "." + item]
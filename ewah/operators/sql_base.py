@@ -77,8 +77,9 @@ class EWAHSQLBaseOperator(EWAHBaseOperator):
     def ewah_execute(self, context):
         # called, potentially with a data_from and data_until
 
-        params = self.extra_params or {}
-        where_clauses = self.where_clauses or []
+        # Copy to not accumulate clauses and params across executions
+        params = dict(self.extra_params or {})
+        where_clauses = list(self.where_clauses or [])
         if self.data_from and self.timestamp_column:
             where_clauses.append(
                 "{0} >= {1}".format(
@@ -46,12 +46,72 @@ class PGO(BaseOperator):
         hook.close()  # SSH tunnel does not close if hook is not closed first
 
 
+class EWAHResetMetadataOperator(BaseOperator):
+    """Airflow operator to delete all metadata of DAGs, e.g. to reset them.
+
+    Deletes from the Airflow metadata database in chunks of chunk_size rows, each
+    chunk in its own transaction, to keep transactions, locks and WAL small even if
+    the metadata database holds millions of task instances.
+    """
+
+    def __init__(
+        self,
+        dag_ids,
+        postgres_conn_id,
+        chunk_size=10000,
+        statement_timeout="5min",  # don't let a chunk wedge the metadata database
+        *args,
+        **kwargs,
+    ):
+        self.dag_ids = dag_ids
+        self.postgres_conn_id = postgres_conn_id
+        self.chunk_size = chunk_size
+        self.statement_timeout = statement_timeout
+        super().__init__(*args, **kwargs)
+
+    def execute(self, context):
+        hook = EWAHBaseHook.get_hook_from_conn_id(self.postgres_conn_id)
+        params = {
+            "dag_ids": list(self.dag_ids),
+            "chunk_size": self.chunk_size,
+            "statement_timeout": self.statement_timeout,
+        }
+        try:
+            # Each chunk is sent as one multi-statement query, which Postgres runs
+            # as one implicit transaction - saves the BEGIN and COMMIT round trips
+            hook.dbconn.autocommit = True
+            for table in EC.AIRFLOW_METADATA_RESET_TABLES:
+                # ctid = ANY(ARRAY(...)) always results in a TID scan, whereas
+                # ctid IN (...) may scan the full table for every chunk
+                sql = """
+                    SET LOCAL synchronous_commit = off;
+                    SET LOCAL statement_timeout = %(statement_timeout)s;
+                    WITH deleted AS (
+                        DELETE FROM {0} WHERE ctid = ANY(ARRAY(
+                            SELECT ctid FROM {0}
+                            WHERE dag_id = ANY(%(dag_ids)s)
+                            LIMIT %(chunk_size)s
+                        ))
+                        RETURNING 1
+                    )
+                    SELECT COUNT(*) FROM deleted;
+                """.format(table)
+                while True:
+                    result = hook.execute_and_return_result(sql, params=params)
+                    deleted = result[0][0]
+                    self.log.info("Deleted {0} rows from {1}.".format(deleted, table))
+                    if deleted < self.chunk_size:
+                        break
+        finally:
+            hook.close()  # SSH tunnel does not close if hook is not closed first
+
+
 def datetime_utcnow_with_tz():
     return datetime.utcnow().replace(tzinfo=pytz.utc)
 
 
 def airflow_datetime_adjustments(datetime_raw):
-    if type(datetime_raw) == str:
+    if isinstance(datetime_raw, str):
         datetime_string = datetime_raw
         if "-" in datetime_string[10:]:
             tz_sign = "-"
@@ -1,6 +1,27 @@
+from collections import deque
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 import six
 
 
 def is_iterable_not_string(obj):
     return isinstance(obj, Iterable) and not isinstance(obj, six.string_types)
+
+
+def bounded_imap(func, iterable, max_workers):
+    """Like ThreadPool.imap, yields func(item) for every item in order, but keeps
+    at most max_workers calls in flight or waiting for the consumer. Thus, a slow
+    consumer does not pile up results in memory."""
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in iterable:
+                if len(pending) >= max_workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(func, item))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # consumer stopped early or a call failed - don't start the rest
+            for future in pending:
+                future.cancel()
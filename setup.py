@@ -38,6 +38,7 @@ setuptools.setup(
         "oauth2client",
         "Office365-REST-Python-Client",
         "openpyxl",
+        "orjson",
         "protobuf",
         "psycopg2",
         "pyairtable",
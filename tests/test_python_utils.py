@@ -0,0 +1,44 @@
+from ewah.utils.python_utils import bounded_imap
+
+from threading import Lock
+
+import time
+
+
+def test_bounded_imap_keeps_order():
+    assert list(bounded_imap(lambda x: x * 2, range(20), 4)) == [
+        x * 2 for x in range(20)
+    ]
+
+
+def test_bounded_imap_does_not_run_ahead_of_slow_consumer():
+    max_workers = 3
+    lock = Lock()
+    started = []
+
+    def fetch(item):
+        with lock:
+            started.append(item)
+        return item
+
+    consumed = 0
+    for item in bounded_imap(fetch, range(30), max_workers):
+        time.sleep(0.01)  # slow consumer, e.g. uploading data
+        consumed += 1
+        with lock:
+            # the item being consumed + at most max_workers calls ahead of it
+            assert len(started) - consumed <= max_workers
+    assert consumed == 30
+
+
+def test_bounded_imap_stops_when_consumer_stops():
+    started = []
+
+    def fetch(item):
+        started.append(item)
+        return item
+
+    results = bounded_imap(fetch, range(1000), 2)
+    assert next(results) == 0
+    results.close()
+    assert len(started) <= 3